@@ -3,6 +3,7 @@ from .functions import (
     drop_path,
     hilbert_freq,
     identity,
+    max_norm_,
     plv_time,
     safe_log,
     square,
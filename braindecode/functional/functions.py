@@ -70,6 +70,35 @@ def drop_path(
     return x * random_tensor
 
 
+@torch.no_grad()
+def max_norm_(weight: torch.Tensor, max_norm: float = 1.0) -> torch.Tensor:
+    """Rescale in-place each slice along the first dimension of ``weight``
+    to have at most ``max_norm`` L2-norm.
+
+    In-place counterpart of :func:`torch.renorm` with ``p=2`` and ``dim=0``,
+    without autograd tracking and without allocating a new weight tensor.
+
+    Parameters
+    ----------
+    weight: torch.Tensor
+        Weight tensor to constrain, e.g. ``(out_channels, in_channels, *kernel)``.
+    max_norm: float
+        Maximum L2-norm of each slice.
+
+    Returns
+    -------
+    torch.Tensor
+        The same tensor ``weight``, rescaled in-place.
+    """
+    if weight.ndim < 2:
+        raise ValueError(
+            f"max_norm_ expects a weight with at least 2 dimensions, got {weight.ndim}."
+        )
+    dims = tuple(range(1, weight.ndim))
+    norms = weight.pow(2).sum(dim=dims, keepdim=True).sqrt_().clamp_(min=max_norm)
+    return weight.mul_(max_norm).div_(norms)
+
+
 def _get_gaussian_kernel1d(kernel_size: int, sigma: float) -> torch.Tensor:
     """
     Generates a 1-dimensional Gaussian kernel based on the specified kernel
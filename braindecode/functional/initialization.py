@@ -1,6 +1,12 @@
 import math
+from functools import lru_cache
 
-from torch import nn
+import torch
+
+
+@lru_cache(maxsize=None)
+def _is_batch_norm(module_class: type) -> bool:
+    return "BatchNorm" in module_class.__name__
 
 
 def glorot_weight_zero_bias(model):
@@ -13,13 +19,26 @@ def glorot_weight_zero_bias(model):
     ----------
     model: Module
     """
+    batch_norm_weights = []
+    biases = []
     for module in model.modules():
-        if hasattr(module, "weight"):
-            if "BatchNorm" in module.__class__.__name__:
-                nn.init.constant_(module.weight, 1)
-        if hasattr(module, "bias"):
-            if module.bias is not None:
-                nn.init.constant_(module.bias, 0)
+        # Only look up the weight of batch norm layers, as accessing a
+        # parametrized weight computes it
+        if _is_batch_norm(type(module)):
+            weight = getattr(module, "weight", None)
+            if weight is not None:
+                batch_norm_weights.append(weight)
+        bias = getattr(module, "bias", None)
+        if isinstance(bias, torch.Tensor):
+            biases.append(bias)
+
+    # Initialize all the tensors at once with multi-tensor kernels
+    with torch.no_grad():
+        if batch_norm_weights:
+            torch._foreach_zero_(batch_norm_weights)
+            torch._foreach_add_(batch_norm_weights, 1.0)
+        if biases:
+            torch._foreach_zero_(biases)
 
 
 def rescale_parameter(param, layer_id):
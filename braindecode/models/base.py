@@ -7,13 +7,18 @@ from __future__ import annotations
 
 import warnings
 from collections import OrderedDict
-from typing import Dict, Iterable, Optional
+from typing import Callable, Dict, Iterable, Optional
 
 import numpy as np
 import torch
 from docstring_inheritance import NumpyDocstringInheritanceInitMeta
+from torch import nn
+from torch.nn.modules.utils import _single
 from torchinfo import ModelStatistics, summary
 
+# Layers whose stride and dilation only apply to the time axis
+_LAYERS_1D = (nn.Conv1d, nn.MaxPool1d, nn.AvgPool1d)
+
 
 def deprecated_args(obj, *old_new_args):
     out_args = []
@@ -174,10 +179,20 @@ class EEGModuleMixin(metaclass=NumpyDocstringInheritanceInitMeta):
         output_shape: tuple[int, ...]
             shape of the network output for `batch_size==1` (1, ...)
         """
+        return self._get_output_shape(self.forward)  # type: ignore[attr-defined]
+
+    def _get_output_shape(
+        self, forward: Callable[[torch.Tensor], torch.Tensor]
+    ) -> tuple[int, ...]:
+        """Returns the output shape of ``forward`` for batch size equal 1.
+
+        Allows models to get the output shape of a part of the network, e.g.
+        before the final layer is added.
+        """
         with torch.inference_mode():
             try:
                 return tuple(
-                    self.forward(  # type: ignore
+                    forward(
                         torch.zeros(
                             self.input_shape,
                             dtype=next(self.parameters()).dtype,  # type: ignore
@@ -225,7 +240,8 @@ class EEGModuleMixin(metaclass=NumpyDocstringInheritanceInitMeta):
         ----------
         axis: int or (int,int)
             Axis to transform (in terms of intermediate output axes)
-            can either be 2, 3, or (2,3).
+            can either be 2, 3, or (2,3). For 1D layers, e.g.
+            :class:`torch.nn.Conv1d`, the time axis is axis 3.
 
         Notes
         -----
@@ -239,7 +255,22 @@ class EEGModuleMixin(metaclass=NumpyDocstringInheritanceInitMeta):
         assert all([ax in [2, 3] for ax in axis]), "Only 2 and 3 allowed for axis"  # type: ignore[union-attr]
         axis = np.array(axis) - 2
         stride_so_far = np.array([1, 1])
+        # The 1D layers only have the time axis, i.e. axis 3
+        transform_time = 1 in axis  # type: ignore[operator]
         for module in self.modules():  # type: ignore
+            if isinstance(module, _LAYERS_1D):
+                if hasattr(module, "dilation"):
+                    assert module.dilation in (1, (1,)), (
+                        "Dilation should equal 1 before conversion, maybe the model is "
+                        "already converted?"
+                    )
+                    if transform_time:
+                        module.dilation = (int(stride_so_far[1]),)
+                (stride,) = _single(module.stride)
+                stride_so_far[1] *= stride
+                if transform_time:
+                    module.stride = (1,)
+                continue
             if hasattr(module, "dilation"):
                 assert module.dilation == 1 or (module.dilation == (1, 1)), (
                     "Dilation should equal 1 before conversion, maybe the model is "
@@ -3,11 +3,16 @@
 # License: BSD (3-clause)
 from __future__ import annotations
 
-from typing import Dict, Optional
+import copy
+from collections import OrderedDict
+from typing import Dict, Optional, cast
 
-from einops.layers.torch import Rearrange
+import torch
+import torch.nn.functional as F
 from mne.utils import warn
 from torch import nn
+from torch.nn.utils import parametrize
+from torch.nn.utils.fusion import fuse_conv_bn_eval
 
 from braindecode.functional import glorot_weight_zero_bias
 from braindecode.models.base import EEGModuleMixin
@@ -16,6 +21,7 @@ from braindecode.modules import (
     Ensure4d,
     Expression,
     LinearWithConstraint,
+    SeparableConv1d,
     SqueezeFinalOutput,
 )
 
@@ -33,6 +39,8 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
     ----------
     final_conv_length : int or "auto", default="auto"
         Length of the final convolution layer. If "auto", it is set based on n_times.
+        A length of 1 is implemented with a linear layer applied at each time
+        step, which loads the checkpoints of the convolution.
     pool_mode : {"mean", "max"}, default="mean"
         Pooling method to use in pooling layers.
     F1 : int, default=8
@@ -66,6 +74,46 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         apply a flattened linear layer with constraint on the weights norm as the final classification step.
     norm_rate : float, default=0.25
         Max-norm constraint value for the linear layer (used if ``final_layer_conv=False``).
+    fuse_separable : bool, default=True
+        If ``True``, the depthwise and pointwise convolutions of the separable
+        block are merged into a single dense convolution, see
+        :class:`braindecode.modules.SeparableConv1d`. If ``False``, they are
+        applied in sequence. Both variants share the same parameters and
+        produce the same outputs. The merged convolution costs
+        ``F2 * F1 * D * depthwise_kernel_length`` multiply-adds per time
+        sample, against ``F1 * D * (depthwise_kernel_length + F2)`` in
+        sequence, so it saves a kernel launch and the intermediate output
+        only for small filter counts, and can be slower for large ``F1 * D``.
+    temporal_conv_impl : {"direct", "fft"}, default="direct"
+        Implementation of the temporal convolution. ``"direct"`` uses
+        :class:`torch.nn.Conv2d`, and ``"fft"`` computes the same convolution
+        with FFTs, whose cost grows as ``n_times * log(n_times)`` instead of
+        ``n_times * kernel_length``. The FFT can pay off for long kernels and
+        windows, but whether it is faster depends on the device and backend,
+        e.g. cuDNN is usually faster with the direct convolution, so benchmark
+        it on the target hardware first. Both share the same parameters.
+    channels_last : bool, default=False
+        If ``True``, the 4D convolution weights and activations, i.e. up to
+        the spatial convolution and in the convolutional classifier, use the
+        :attr:`torch.channels_last` memory format, for which cuDNN provides
+        faster depthwise kernels with fp16/bf16 on recent GPUs. Inputs are
+        converted internally after ``dimshuffle``, so they can be passed as
+        usual. Compatible with :class:`torch.autocast`.
+    compile : bool, default=False
+        If ``True``, the model is compiled with :func:`torch.compile` at the
+        end of the construction, with ``mode="reduce-overhead"`` and
+        ``dynamic=False`` as the input shape is fixed by ``n_chans`` and
+        ``n_times``. On GPU, this mode uses CUDA graphs, which removes the
+        kernel launch latency that dominates for the small tensors of this
+        network.
+    share_bn_stats_with : EEGNetv4 or None, default=None
+        If given, the batch norm layers of the model use the running mean,
+        running variance and batch counter buffers of the corresponding layers
+        of this model, instead of their own copies. Useful for ensembles or
+        fp32/bf16 copies of a model sharing the same normalization
+        statistics, which are then updated in place by both models during
+        training. The sharing is lost if one of the models moves its
+        buffers, e.g. to another device.
 
     References
     ----------
@@ -75,6 +123,24 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         neural engineering, 15(5), 056013.
     """
 
+    # Layers registered with add_module and called in the forward
+    ensuredims: nn.Module
+    dimshuffle: nn.Module
+    conv_temporal: nn.Conv2d
+    bnorm_temporal: nn.Module
+    conv_spatial: nn.Conv2d
+    bnorm_1: nn.Module
+    squeeze_height: nn.Module
+    elu_1: nn.Module
+    pool_1: nn.Module
+    drop_1: nn.Module
+    separable: SeparableConv1d
+    bnorm_2: nn.Module
+    elu_2: nn.Module
+    pool_2: nn.Module
+    drop_2: nn.Module
+    final_layer: nn.Module
+
     def __init__(
         self,
         # signal's parameters
@@ -100,6 +166,11 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         drop_prob: float = 0.25,
         final_layer_with_constraint: bool = False,
         norm_rate: float = 0.25,
+        fuse_separable: bool = True,
+        temporal_conv_impl: str = "direct",
+        channels_last: bool = False,
+        compile: bool = False,
+        share_bn_stats_with: Optional[EEGNetv4] = None,
         # Other ways to construct the signal related parameters
         chs_info: Optional[list[Dict]] = None,
         input_window_seconds=None,
@@ -154,6 +225,13 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         self.batch_norm_eps = batch_norm_eps
         self.conv_spatial_max_norm = conv_spatial_max_norm
         self.norm_rate = norm_rate
+        self.fuse_separable = fuse_separable
+        self.temporal_conv_impl = temporal_conv_impl
+        self.channels_last = channels_last
+        # Set by enable_cuda_graph
+        self._cuda_graph: Optional[torch.cuda.CUDAGraph] = None
+        self._static_input: Optional[torch.Tensor] = None
+        self._static_output: Optional[torch.Tensor] = None
 
         # For the load_state_dict
         # When padronize all layers,
@@ -161,15 +239,26 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         self.mapping = {
             "conv_classifier.weight": "final_layer.conv_classifier.weight",
             "conv_classifier.bias": "final_layer.conv_classifier.bias",
+            "conv_separable_depth.weight": "separable.depthwise.weight",
+            "conv_separable_point.weight": "separable.pointwise.weight",
         }
 
-        pool_class = dict(max=nn.MaxPool2d, mean=nn.AvgPool2d)[self.pool_mode]
+        pool_class = dict(max=nn.MaxPool1d, mean=_MeanPool1d)[self.pool_mode]
+        if self.temporal_conv_impl not in ("direct", "fft"):
+            raise ValueError(
+                "temporal_conv_impl must be 'direct' or 'fft', got "
+                f"{self.temporal_conv_impl!r}."
+            )
+        conv_temporal_class = (
+            _FFTConv2d if self.temporal_conv_impl == "fft" else nn.Conv2d
+        )
         self.add_module("ensuredims", Ensure4d())
 
-        self.add_module("dimshuffle", Rearrange("batch ch t 1 -> batch 1 ch t"))
+        # batch ch t 1 -> batch 1 ch t
+        self.add_module("dimshuffle", _Permute(0, 3, 1, 2))
         self.add_module(
             "conv_temporal",
-            nn.Conv2d(
+            conv_temporal_class(
                 1,
                 self.F1,
                 (1, self.kernel_length),
@@ -207,41 +296,35 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
                 eps=self.batch_norm_eps,
             ),
         )
+        # The spatial convolution collapses the EEG channels, so the rest of
+        # the network works on (batch, filters, time) with 1D layers.
+        self.add_module("squeeze_height", _Squeeze(2))
         self.add_module("elu_1", activation())
 
         self.add_module(
             "pool_1",
             pool_class(
-                kernel_size=(1, self.pool1_kernel_size),
+                kernel_size=self.pool1_kernel_size,
             ),
         )
         self.add_module("drop_1", nn.Dropout(p=self.drop_prob))
 
         # https://discuss.pytorch.org/t/how-to-modify-a-conv2d-to-depthwise-separable-convolution/15843/7
         self.add_module(
-            "conv_separable_depth",
-            nn.Conv2d(
-                self.F1 * self.D,
-                self.F1 * self.D,
-                (1, self.depthwise_kernel_length),
-                bias=False,
-                groups=self.F1 * self.D,
-                padding=(0, self.depthwise_kernel_length // 2),
-            ),
-        )
-        self.add_module(
-            "conv_separable_point",
-            nn.Conv2d(
+            "separable",
+            SeparableConv1d(
                 self.F1 * self.D,
                 self.F2,
-                kernel_size=(1, 1),
+                self.depthwise_kernel_length,
+                padding=self.depthwise_kernel_length // 2,
                 bias=False,
+                fused=self.fuse_separable,
             ),
         )
 
         self.add_module(
             "bnorm_2",
-            nn.BatchNorm2d(
+            nn.BatchNorm1d(
                 self.F2,
                 momentum=self.batch_norm_momentum,
                 affine=self.batch_norm_affine,
@@ -252,39 +335,51 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
         self.add_module(
             "pool_2",
             pool_class(
-                kernel_size=(1, self.pool2_kernel_size),
+                kernel_size=self.pool2_kernel_size,
             ),
         )
         self.add_module("drop_2", nn.Dropout(p=self.drop_prob))
 
-        output_shape = self.get_output_shape()
-        n_out_virtual_chans = output_shape[2]
-
+        n_out_time = _compute_output_time(
+            n_times=self.n_times,
+            kernel_length=self.kernel_length,
+            pool1_kernel_size=self.pool1_kernel_size,
+            depthwise_kernel_length=self.depthwise_kernel_length,
+            pool2_kernel_size=self.pool2_kernel_size,
+        )
         if self.final_conv_length == "auto":
-            n_out_time = output_shape[3]
             self.final_conv_length = n_out_time
 
         # Incorporating classification module and subsequent ones in one final layer
         module = nn.Sequential()
-        if not final_layer_with_constraint:
+        if not final_layer_with_constraint and self.final_conv_length == 1:
+            # A convolution with a kernel of one time sample is a linear
+            # layer applied at each time step, which is cheaper as a matmul
+            module.add_module("linear", _PointwiseLinear(self.F2, self.n_outputs))
+            # Checkpoints of the convolutional classifier load into it, the
+            # weights being reshaped in load_state_dict.
+            for name in ["weight", "bias"]:
+                self.mapping[f"conv_classifier.{name}"] = f"final_layer.linear.{name}"
+                self.mapping[f"final_layer.conv_classifier.{name}"] = (
+                    f"final_layer.linear.{name}"
+                )
+        elif not final_layer_with_constraint:
+            # The classifier keeps its 2D layout, so its weights and the
+            # output convention are unchanged.
+            module.add_module("unsqueeze_height", _Unsqueeze(2))
             module.add_module(
                 "conv_classifier",
                 nn.Conv2d(
                     self.F2,
                     self.n_outputs,
-                    (n_out_virtual_chans, self.final_conv_length),
+                    (1, self.final_conv_length),
                     bias=True,
                 ),
             )
 
-            # Transpose back to the logic of braindecode,
-            # so time in third dimension (axis=2)
-            module.add_module(
-                "permute_back",
-                Rearrange("batch x y z -> batch x z y"),
-            )
-
-            module.add_module("squeeze", SqueezeFinalOutput())
+            # Drop the height, and the time if it is a singleton, as a
+            # single view of the classifier output
+            module.add_module("squeeze", _SqueezeClassifierOutput())
         else:
             module.add_module("flatten", nn.Flatten())
             module.add_module(
@@ -299,6 +394,414 @@ class EEGNetv4(EEGModuleMixin, nn.Sequential):
 
         glorot_weight_zero_bias(self)
 
+        if share_bn_stats_with is not None:
+            self._share_bn_stats(share_bn_stats_with)
+
+        if self.channels_last:
+            self.to(memory_format=torch.channels_last)
+
+        if compile:
+            self.compile(mode="reduce-overhead", dynamic=False)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        graph = self._cuda_graph
+        static_input = self._static_input
+        static_output = self._static_output
+        if (
+            graph is not None
+            and static_input is not None
+            and static_output is not None
+            and not self.training
+            and not torch.is_grad_enabled()
+            and x.shape == static_input.shape
+            and x.dtype == static_input.dtype
+            and x.device == static_input.device
+        ):
+            static_input.copy_(x)
+            graph.replay()
+            return static_output
+        return self._forward_after_temporal(self._forward_temporal(x))
+
+    # The layers are called explicitly rather than by iterating over the
+    # modules as in nn.Sequential, which saves the Python overhead per layer.
+    # 4D activations are kept in channels last if requested, while the 1D
+    # part of the network runs on contiguous tensors.
+    def _forward_temporal(self, x: torch.Tensor) -> torch.Tensor:
+        x = self.ensuredims(x)
+        x = self.dimshuffle(x)
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        x = self.conv_temporal(x)
+        x = self.bnorm_temporal(x)
+        return x
+
+    def _forward_after_temporal(self, x: torch.Tensor) -> torch.Tensor:
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        x = self.conv_spatial(x)
+        x = self.bnorm_1(x)
+        x = self.squeeze_height(x)
+        if self.channels_last:
+            x = x.contiguous()
+        x = _apply_activation(self.elu_1, x)
+        x = self.pool_1(x)
+        x = self.drop_1(x)
+        x = self.separable(x)
+        x = self.bnorm_2(x)
+        x = _apply_activation(self.elu_2, x)
+        x = self.pool_2(x)
+        x = self.drop_2(x)
+        x = self.final_layer(x)
+        if self.channels_last:
+            x = x.contiguous()
+        return x
+
+    def forward_windows(
+        self, x: torch.Tensor, window_size: int, hop: int
+    ) -> torch.Tensor:
+        """Predict on sliding windows of a long recording.
+
+        The temporal convolution and its batch norm are computed once on the
+        whole recording, and their output is cut into the windows, which
+        then go through the rest of the network as one batch. Overlapping
+        windows thus share the cost of the largest convolution of the model.
+
+        Contrary to running :meth:`forward` on each window, the temporal
+        convolution of a window sees the neighbouring samples of the
+        recording instead of zero padding, so the predictions differ close
+        to the window borders. Meant for inference, in eval mode.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            Recordings of shape ``(batch_size, n_chans, n_times_total)``.
+        window_size : int
+            Number of time samples of each window.
+        hop : int
+            Number of time samples between the starts of two windows.
+
+        Returns
+        -------
+        torch.Tensor
+            Predictions of shape ``(batch_size, n_windows, n_outputs)``, with
+            a trailing time dimension for windows longer than ``n_times``.
+        """
+        if x.shape[-1] < window_size:
+            raise ValueError(
+                f"The recording has {x.shape[-1]} time samples, which is fewer "
+                f"than {window_size=}."
+            )
+        x = self._forward_temporal(x)
+        # Length of the temporal convolution output of a single window
+        kernel_size = self.conv_temporal.kernel_size[-1]
+        # The padding is an int, not "same" or "valid"
+        padding = cast(int, self.conv_temporal.padding[-1])
+        size = window_size + 2 * padding - kernel_size + 1
+        # (batch, F1, n_chans, n_windows, size)
+        x = x.unfold(-1, size, hop)
+        batch_size, n_windows = x.shape[0], x.shape[3]
+        x = x.permute(0, 3, 1, 2, 4).reshape(
+            batch_size * n_windows, x.shape[1], x.shape[2], size
+        )
+        x = self._forward_after_temporal(x)
+        return x.reshape(batch_size, n_windows, *x.shape[1:])
+
+    def _share_bn_stats(self, other: EEGNetv4):
+        own_bns = [
+            m for m in self.modules() if isinstance(m, nn.modules.batchnorm._BatchNorm)
+        ]
+        other_bns = [
+            m for m in other.modules() if isinstance(m, nn.modules.batchnorm._BatchNorm)
+        ]
+        if (
+            getattr(other, "batch_norm_affine", None) != self.batch_norm_affine
+            or len(own_bns) != len(other_bns)
+            or any(a.num_features != b.num_features for a, b in zip(own_bns, other_bns))
+        ):
+            raise ValueError(
+                "share_bn_stats_with requires a model with the same batch norm "
+                "layers, built with the same batch_norm_affine and filter sizes."
+            )
+        for own_bn, other_bn in zip(own_bns, other_bns):
+            own_bn.running_mean = other_bn.running_mean
+            own_bn.running_var = other_bn.running_var
+            own_bn.num_batches_tracked = other_bn.num_batches_tracked
+
+    def fuse_for_inference(self) -> EEGNetv4:
+        """Fold the batch norm layers into the preceding convolutions.
+
+        In eval mode, batch norm is a per-channel affine transform. It is
+        folded into the weight and bias of ``conv_temporal``, ``conv_spatial``
+        and the pointwise convolution of ``separable``, and the batch norm
+        layers are replaced by :class:`torch.nn.Identity`. The max-norm
+        constraint of ``conv_spatial`` is applied one last time and removed.
+        Modifies the model in-place, which can then only be used for
+        inference.
+
+        Returns
+        -------
+        EEGNetv4
+            The model itself.
+        """
+        if self.training:
+            raise ValueError(
+                "fuse_for_inference folds the running statistics of the batch "
+                "norm layers, call model.eval() first."
+            )
+        conv_bn_pairs = [
+            (self, "conv_temporal", "bnorm_temporal"),
+            (self, "conv_spatial", "bnorm_1"),
+            (self.separable, "pointwise", "bnorm_2"),
+        ]
+        for parent, conv_name, bn_name in conv_bn_pairs:
+            bn = getattr(self, bn_name)
+            if not isinstance(bn, nn.modules.batchnorm._BatchNorm):
+                continue
+            conv = getattr(parent, conv_name)
+            _remove_parametrizations(conv)
+            setattr(parent, conv_name, fuse_conv_bn_eval(conv, bn))
+            setattr(self, bn_name, nn.Identity())
+        self._reset_cuda_graph()
+        return self
+
+    def strip_dropout_for_inference(self) -> EEGNetv4:
+        """Replace the dropout layers by :class:`torch.nn.Identity`.
+
+        Dropout is a pass-through in eval mode, but still costs a dispatch per
+        forward, and under :func:`torch.compile` it limits the fusion of the
+        neighbouring operations. Can be combined with
+        :meth:`fuse_for_inference`. Modifies the model in-place, which can
+        then only be used for inference.
+
+        Returns
+        -------
+        EEGNetv4
+            The model itself.
+        """
+        self.drop_1 = nn.Identity()
+        self.drop_2 = nn.Identity()
+        return self
+
+    def enable_cuda_graph(self, batch_size: int) -> EEGNetv4:
+        """Capture the inference forward in a CUDA graph.
+
+        For online or fixed-size batch inference, the whole forward is then
+        replayed as a single graph launch, without the Python and memory
+        allocator overhead of the eager forward. The graph is captured for
+        inputs of shape ``(batch_size, n_chans, n_times)`` and is used in eval
+        mode with gradients disabled, e.g. under :func:`torch.no_grad`. Inputs
+        with another shape, dtype or device, or in train mode, go through the
+        usual forward. The graph is discarded when the model is moved or cast,
+        e.g. with :meth:`torch.nn.Module.to`, :meth:`fuse_for_inference` or
+        :meth:`to_mixed_precision`, and must then be captured again.
+
+        The input is copied into a static buffer and the returned tensor is a
+        static output buffer, which is overwritten by the next call, so clone
+        it to keep the predictions. No gradients are computed through the
+        graph. The model must be on a CUDA device and in eval mode.
+
+        Parameters
+        ----------
+        batch_size : int
+            Batch size of the inputs to replay the graph for.
+
+        Returns
+        -------
+        EEGNetv4
+            The model itself.
+        """
+        if self.training:
+            raise ValueError(
+                "enable_cuda_graph captures the inference forward, call "
+                "model.eval() first."
+            )
+        weight = self.conv_temporal.weight
+        if weight.device.type != "cuda":
+            raise ValueError(
+                "enable_cuda_graph requires the model on a CUDA device, call "
+                "model.cuda() first."
+            )
+        self._reset_cuda_graph()
+        static_input = torch.zeros(
+            batch_size,
+            self.n_chans,
+            self.n_times,
+            device=weight.device,
+            dtype=weight.dtype,
+        )
+        with torch.no_grad():
+            # Warm up on a side stream before capturing, as required by CUDA graphs
+            stream = torch.cuda.Stream(weight.device)
+            stream.wait_stream(torch.cuda.current_stream(weight.device))
+            with torch.cuda.stream(stream):
+                for _ in range(2):
+                    self._forward_after_temporal(self._forward_temporal(static_input))
+            torch.cuda.current_stream(weight.device).wait_stream(stream)
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                static_output = self._forward_after_temporal(
+                    self._forward_temporal(static_input)
+                )
+
+        self._cuda_graph = graph
+        self._static_input = static_input
+        self._static_output = static_output
+        return self
+
+    def _reset_cuda_graph(self) -> None:
+        # The captured kernels are bound to the tensors of the model at
+        # capture time, so the graph is stale once they are changed.
+        self._cuda_graph = None
+        self._static_input = None
+        self._static_output = None
+
+    def _apply(self, fn, *args, **kwargs):
+        # Called by .to(), .cuda(), .double(), etc.
+        self._reset_cuda_graph()
+        return super()._apply(fn, *args, **kwargs)
+
+    def to_mixed_precision(self, dtype: torch.dtype = torch.bfloat16) -> EEGNetv4:
+        """Cast the model to a reduced precision, keeping batch norm in fp32.
+
+        Halves the memory traffic of the convolution, pooling and dropout
+        layers, while the batch norm parameters and running statistics stay
+        in fp32 as in the usual mixed precision recipe. The batch norm tensors
+        are not copied, so statistics shared with ``share_bn_stats_with`` stay
+        shared. Inputs must be cast to ``dtype`` too. Alternatively, keep the
+        model in fp32 and run it under :class:`torch.autocast`. Modifies the
+        model in-place.
+
+        Parameters
+        ----------
+        dtype : torch.dtype, default=torch.bfloat16
+            Floating point type of the parameters, e.g. ``torch.bfloat16`` or
+            ``torch.float16``.
+
+        Returns
+        -------
+        EEGNetv4
+            The model itself.
+        """
+        for module in self.modules():
+            if isinstance(module, nn.modules.batchnorm._BatchNorm):
+                continue
+            for param in module.parameters(recurse=False):
+                param.data = param.data.to(dtype)
+            for name, buffer in module.named_buffers(recurse=False):
+                if buffer.is_floating_point():
+                    setattr(module, name, buffer.to(dtype))
+        self._reset_cuda_graph()
+        return self
+
+    def to_torchscript(self) -> torch.jit.ScriptModule:
+        """Convert the model to TorchScript, e.g. for CPU or edge inference.
+
+        The layers are scripted as a plain :class:`torch.nn.Sequential` with
+        the same names. Parametrizations cannot run in TorchScript, so the
+        max-norm constraints are applied to the weights one last time and
+        removed, which makes the scripted model meant for inference. The
+        model itself is not modified.
+
+        Returns
+        -------
+        torch.jit.ScriptModule
+            Scripted copy of the model, in the same train/eval mode.
+
+        Examples
+        --------
+        >>> model = EEGNetv4(n_chans=22, n_outputs=4, n_times=1000).eval()
+        >>> scripted_model = model.to_torchscript()
+        >>> scripted_model.save("eegnetv4.pt")  # doctest: +SKIP
+        """
+        layers = copy.deepcopy(OrderedDict(self.named_children()))
+        plain_model = nn.Sequential(layers).train(self.training)
+        for module in plain_model.modules():
+            _remove_parametrizations(module)
+        return torch.jit.script(plain_model)
+
+    def load_state_dict(self, state_dict, *args, **kwargs):
+        # Legacy checkpoints store the weights of the renamed layers with
+        # singleton dimensions after the channels, e.g. ``(out, in, 1, kernel)``
+        # for the 1D separable convolution.
+        mapping = self.mapping if self.mapping else {}
+        own_state = self.state_dict()
+        new_state_dict = OrderedDict()
+        for k, v in state_dict.items():
+            if k in mapping:
+                k = mapping[k]
+                if k in own_state and v.shape != own_state[k].shape:
+                    squeezed = v
+                    while squeezed.dim() > max(own_state[k].dim(), 2) and (
+                        squeezed.shape[2] == 1
+                    ):
+                        squeezed = squeezed.squeeze(2)
+                    if squeezed.shape != own_state[k].shape:
+                        raise ValueError(
+                            f"Cannot load a tensor of shape {tuple(v.shape)} into "
+                            f"{k} of shape {tuple(own_state[k].shape)}."
+                        )
+                    v = squeezed
+            new_state_dict[k] = v
+
+        return super().load_state_dict(new_state_dict, *args, **kwargs)
+
+
+def _apply_activation(activation: nn.Module, x: torch.Tensor) -> torch.Tensor:
+    # The default ELU is applied functionally, which skips the dispatch of
+    # Module.__call__ but also its hooks. Other activations are called as
+    # modules.
+    if type(activation) is nn.ELU:
+        return F.elu(x, activation.alpha, activation.inplace)
+    return activation(x)
+
+
+def _remove_parametrizations(module: nn.Module):
+    """Replace the parametrized tensors of ``module`` by plain parameters.
+
+    The parametrizations are applied one last time. Contrary to
+    :func:`torch.nn.utils.parametrize.remove_parametrizations`, the
+    parametrized class is left untouched: a deep copy of a parametrized module
+    shares this class with the original, which would lose its parametrized
+    tensors too. The plain class is restored by hand on ``module`` instead.
+    """
+    if not parametrize.is_parametrized(module):
+        return
+    parametrizations = cast(nn.ModuleDict, module.parametrizations)
+    tensors = {name: getattr(module, name).detach() for name in parametrizations}
+    module.__class__ = parametrize.type_before_parametrizations(module)
+    del module.parametrizations
+    for name, tensor in tensors.items():
+        setattr(module, name, nn.Parameter(tensor))
+
+
+def _compute_output_time(
+    n_times: int,
+    kernel_length: int,
+    pool1_kernel_size: int,
+    depthwise_kernel_length: int,
+    pool2_kernel_size: int,
+) -> int:
+    """Number of time samples at the output of the EEGNetv4 feature extractor.
+
+    Mirrors the padding and strides of ``conv_temporal``, ``pool_1``,
+    ``separable`` and ``pool_2``, so the size of the classifier can be known
+    without a forward pass.
+    """
+    # Convolutions padded with kernel // 2 on both sides
+    n_out = n_times + 2 * (kernel_length // 2) - kernel_length + 1
+    # Pooling with stride equal to the kernel size
+    n_out = n_out // pool1_kernel_size
+    n_out = n_out + 2 * (depthwise_kernel_length // 2) - depthwise_kernel_length + 1
+    n_out = n_out // pool2_kernel_size
+    if n_out < 1:
+        raise ValueError(
+            f"The output of the pooling layers is empty for {n_times=}. The "
+            "model requires longer chunks of signal in the input, or smaller "
+            "pooling kernels."
+        )
+    return n_out
+
 
 class EEGNetv1(EEGModuleMixin, nn.Sequential):
     """EEGNet model from Lawhern et al. 2016 from [EEGNet]_.
@@ -316,6 +819,13 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
     activation: nn.Module, default=nn.ELU
         Activation function class to apply. Should be a PyTorch activation
         module class like ``nn.ReLU`` or ``nn.ELU``. Default is ``nn.ELU``.
+    compile : bool, default=False
+        If ``True``, the model is compiled with :func:`torch.compile` at the
+        end of the construction, with ``mode="reduce-overhead"`` and
+        ``dynamic=False`` as the input shape is fixed by ``n_chans`` and
+        ``n_times``. On GPU, this mode uses CUDA graphs, which removes the
+        kernel launch latency that dominates for the small tensors of this
+        network.
 
     Notes
     -----
@@ -331,6 +841,25 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
        arXiv preprint arXiv:1611.08024.
     """
 
+    # Layers registered with add_module and called in the forward
+    ensuredims: nn.Module
+    conv_1: nn.Module
+    bnorm_1: nn.Module
+    elu_1: nn.Module
+    permute_1: nn.Module
+    drop_1: nn.Module
+    conv_2: nn.Module
+    bnorm_2: nn.Module
+    elu_2: nn.Module
+    pool_2: nn.Module
+    drop_2: nn.Module
+    conv_3: nn.Module
+    bnorm_3: nn.Module
+    elu_3: nn.Module
+    pool_3: nn.Module
+    drop_3: nn.Module
+    final_layer: nn.Module
+
     def __init__(
         self,
         n_chans=None,
@@ -342,6 +871,7 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
         third_kernel_size=(8, 4),
         drop_prob=0.25,
         activation: nn.Module = nn.ELU,
+        compile: bool = False,
         chs_info=None,
         input_window_seconds=None,
         sfreq=None,
@@ -389,7 +919,7 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
         )
         self.add_module("elu_1", activation())
         # transpose to examples x 1 x (virtual, not EEG) channels x time
-        self.add_module("permute_1", Rearrange("batch x y z -> batch z x y"))
+        self.add_module("permute_1", _Permute(0, 3, 1, 2))
 
         self.add_module("drop_1", nn.Dropout(p=self.drop_prob))
 
@@ -438,7 +968,7 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
         self.add_module("pool_3", pool_class(kernel_size=(2, 4), stride=(2, 4)))
         self.add_module("drop_3", nn.Dropout(p=self.drop_prob))
 
-        output_shape = self.get_output_shape()
+        output_shape = self._get_output_shape(self._forward_features)
         n_out_virtual_chans = output_shape[2]
 
         if self.final_conv_length == "auto":
@@ -461,13 +991,196 @@ class EEGNetv1(EEGModuleMixin, nn.Sequential):
         # Transpose back to the logic of braindecode,
 
         # so time in third dimension (axis=2)
-        module.add_module(
-            "permute_2",
-            Rearrange("batch x y z -> batch x z y"),
-        )
+        module.add_module("permute_2", _Permute(0, 1, 3, 2))
 
         module.add_module("squeeze", SqueezeFinalOutput())
 
         self.add_module("final_layer", module)
 
         glorot_weight_zero_bias(self)
+
+        if compile:
+            self.compile(mode="reduce-overhead", dynamic=False)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.final_layer(self._forward_features(x))
+
+    def _forward_features(self, x: torch.Tensor) -> torch.Tensor:
+        x = self.ensuredims(x)
+        x = self.conv_1(x)
+        x = self.bnorm_1(x)
+        x = self.elu_1(x)
+        x = self.permute_1(x)
+        x = self.drop_1(x)
+        x = self.conv_2(x)
+        x = self.bnorm_2(x)
+        x = self.elu_2(x)
+        x = self.pool_2(x)
+        x = self.drop_2(x)
+        x = self.conv_3(x)
+        x = self.bnorm_3(x)
+        x = self.elu_3(x)
+        x = self.pool_3(x)
+        x = self.drop_3(x)
+        return x
+
+
+def _next_fast_len(n: int) -> int:
+    """Smallest integer ``>= n`` with 2, 3 and 5 as only prime factors."""
+    fast_len = n - 1
+    remainder = 0
+    while remainder != 1:
+        fast_len += 1
+        remainder = fast_len
+        for factor in [2, 3, 5]:
+            while remainder % factor == 0:
+                remainder = remainder // factor
+    return fast_len
+
+
+class _FFTConv2d(nn.Conv2d):
+    """Convolution over time of single channel inputs, computed with FFTs.
+
+    Same parameters and outputs as :class:`torch.nn.Conv2d`, for one input
+    channel, a kernel of height one, no stride or dilation and a temporal
+    padding shorter than the kernel, as in the temporal convolution of
+    EEGNet. The cost grows as ``T * log(T)`` instead of ``T * K`` for
+    inputs of ``T`` samples and kernels of ``K`` samples.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if (
+            self.in_channels != 1
+            or self.kernel_size[0] != 1
+            or self.stride != (1, 1)
+            or self.dilation != (1, 1)
+            or isinstance(self.padding, str)
+            or self.padding[0] != 0
+            or self.padding[1] >= self.kernel_size[1]
+        ):
+            raise ValueError(
+                "_FFTConv2d only supports a single input channel, a (1, K) "
+                "kernel, no stride or dilation, and a padding (0, p) with p < K."
+            )
+        self.time_padding = self.padding[1]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        kernel_length = self.kernel_size[1]
+        n_times = x.shape[-1]
+        n_fft = _next_fast_len(n_times + kernel_length - 1)
+        n_out = n_times + 2 * self.time_padding - kernel_length + 1
+        start = kernel_length - 1 - self.time_padding
+        # The cross-correlation is a convolution with the flipped kernel.
+        # FFTs of half precision inputs are computed in fp32, as half
+        # precision is not supported on all devices.
+        fft_dtype = torch.promote_types(x.dtype, torch.float32)
+        x_fft = torch.fft.rfft(x.to(fft_dtype), n=n_fft)
+        weight_fft = torch.fft.rfft(self.weight.to(fft_dtype).flip(-1), n=n_fft)
+        # (batch, 1, n_chans, freqs) * (filters, 1, freqs)
+        y = torch.fft.irfft(x_fft * weight_fft.squeeze(1), n=n_fft)
+        y = y[..., start : start + n_out].to(x.dtype)
+        bias = self.bias
+        if bias is not None:
+            y = y + bias.view(1, -1, 1, 1)
+        return y
+
+
+class _Permute(nn.Module):
+    """Permute the dimensions of the input.
+
+    Only used to move singleton dimensions around, so the result is a view of
+    the input and no data is copied.
+    """
+
+    def __init__(self, *dims: int):
+        super().__init__()
+        self.dims = list(dims)
+
+    def extra_repr(self) -> str:
+        return f"dims={tuple(self.dims)}"
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return x.permute(self.dims)
+
+
+class _Squeeze(nn.Module):
+    """Remove the singleton dimension ``dim`` of the input, as a view."""
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def extra_repr(self) -> str:
+        return f"dim={self.dim}"
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return x.squeeze(self.dim)
+
+
+class _Unsqueeze(nn.Module):
+    """Insert a singleton dimension at ``dim`` of the input, as a view."""
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def extra_repr(self) -> str:
+        return f"dim={self.dim}"
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return x.unsqueeze(self.dim)
+
+
+class _PointwiseLinear(nn.Linear):
+    """Linear layer over the filters of ``(batch, filters, time)`` inputs.
+
+    Equivalent to a convolution with a kernel of one time sample. Returns
+    ``(batch, out_features)`` if the time dimension is a singleton and
+    ``(batch, out_features, time)`` otherwise.
+    """
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if x.shape[-1] == 1:
+            return F.linear(x.flatten(start_dim=1), self.weight, self.bias)
+        return F.linear(x.transpose(1, 2), self.weight, self.bias).transpose(1, 2)
+
+
+class _SqueezeClassifierOutput(nn.Module):
+    """Squeeze the ``(batch, n_outputs, 1, time)`` classifier output.
+
+    Returns ``(batch, n_outputs)`` if the time dimension is a singleton and
+    ``(batch, n_outputs, time)`` otherwise, like
+    :class:`braindecode.modules.SqueezeFinalOutput` after moving the time to
+    the third dimension. Both cases are a single view of the input.
+    """
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if x.shape[-1] == 1:
+            return x.flatten(start_dim=1)
+        return x.squeeze(2)
+
+
+class _MeanPool1d(nn.AvgPool1d):
+    """Average pooling over time, as :class:`torch.nn.AvgPool1d`.
+
+    With a stride equal to the kernel size, it is computed as a mean over a
+    reshaped view of the input. This is a plain reduction over contiguous
+    memory, while ``avg_pool1d`` goes through the 2D pooling kernel. Other
+    strides, e.g. after ``to_dense_prediction_model``, use ``avg_pool1d``.
+    """
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.stride != self.kernel_size or self.padding != (0,):
+            return F.avg_pool1d(
+                x,
+                self.kernel_size,
+                self.stride,
+                self.padding,
+                self.ceil_mode,
+                self.count_include_pad,
+            )
+        kernel_size = self.kernel_size[0]  # type: ignore[index]
+        n_out = x.shape[-1] // kernel_size
+        x = x[..., : n_out * kernel_size]
+        return x.reshape(x.shape[0], x.shape[1], n_out, kernel_size).mean(-1)
@@ -20,11 +20,12 @@ from .convolution import (
     CombinedConv,
     Conv2dWithConstraint,
     DepthwiseConv2d,
+    SeparableConv1d,
 )
 from .filter import FilterBankLayer, GeneralizedGaussianFilter
 from .layers import Chomp1d, DropPath, Ensure4d, SqueezeFinalOutput, TimeDistributed
 from .linear import LinearWithConstraint, MaxNormLinear
-from .parametrization import MaxNorm, MaxNormParametrize
+from .parametrization import MaxNorm, MaxNormManager, MaxNormParametrize
 from .stats import (
     LogPowerLayer,
     LogVarLayer,
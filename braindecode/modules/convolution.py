@@ -156,6 +156,75 @@ class CombinedConv(nn.Module):
         return F.conv2d(x, weight=combined_weight, bias=bias, stride=(1, 1))
 
 
+class SeparableConv1d(nn.Module):
+    """Depthwise-separable temporal convolution.
+
+    Depthwise temporal convolution followed by a pointwise (1x1)
+    convolution across channels. As there is no non-linearity between the
+    two, their weights are merged on the forward pass and a single
+    convolution is computed, so the intermediate depthwise output is never
+    materialized. Numerically equivalent to applying ``depthwise`` and
+    ``pointwise`` in sequence.
+
+    Parameters
+    ----------
+    in_channels : int
+        Number of input channels.
+    out_channels : int
+        Number of output channels of the pointwise convolution.
+    kernel_size : int
+        Length of the depthwise convolution kernel.
+    padding : int, optional
+        Padding added to both sides of the input. Default is 0.
+    bias : bool, optional
+        If True, adds a learnable bias to the pointwise convolution.
+        Default is False.
+    fused : bool, optional
+        If True, merges the depthwise and pointwise weights and computes a
+        single dense convolution. If False, applies both convolutions in
+        sequence. The merged convolution costs
+        ``out_channels * in_channels * kernel_size`` multiply-adds per time
+        sample instead of ``in_channels * (kernel_size + out_channels)``, so it
+        pays off for small channel counts, where the cost is dominated by
+        the kernel launches, and can be slower otherwise. Default is True.
+    """
+
+    def __init__(
+        self,
+        in_channels,
+        out_channels,
+        kernel_size,
+        padding=0,
+        bias=False,
+        fused=True,
+    ):
+        super().__init__()
+        self.fused = fused
+        self.depthwise = nn.Conv1d(
+            in_channels,
+            in_channels,
+            kernel_size,
+            padding=padding,
+            groups=in_channels,
+            bias=False,
+        )
+        self.pointwise = nn.Conv1d(in_channels, out_channels, 1, bias=bias)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if not self.fused:
+            return self.pointwise(self.depthwise(x))
+        # (out, in, 1) * (1, in, kernel) -> (out, in, kernel)
+        combined_weight = self.pointwise.weight * self.depthwise.weight.transpose(0, 1)
+        return F.conv1d(
+            x,
+            combined_weight,
+            self.pointwise.bias,
+            stride=self.depthwise.stride,
+            padding=self.depthwise.padding,
+            dilation=self.depthwise.dilation,
+        )
+
+
 class CausalConv1d(nn.Conv1d):
     """Causal 1-dimensional convolution
 
@@ -1,5 +1,8 @@
+from typing import cast
+
 import torch
 from torch import nn
+from torch.nn.utils import parametrize
 
 
 class MaxNorm(nn.Module):
@@ -34,5 +37,93 @@ class MaxNormParametrize(nn.Module):
         self.max_norm = max_norm
 
     def forward(self, X: torch.Tensor) -> torch.Tensor:
-        # Renormalize each "row" (dim=0 slice) to have at most self.max_norm L2-norm
-        return X.renorm(p=2, dim=0, maxnorm=self.max_norm)
+        # Renormalize each "row" (dim=0 slice) to have at most self.max_norm L2-norm.
+        # The norms of half precision weights are computed in fp32, so they
+        # are not rescaled with a rounded norm, while fp32/fp64 weights keep
+        # their precision.
+        dtype = torch.promote_types(X.dtype, torch.float32)
+        return X.to(dtype).renorm(p=2, dim=0, maxnorm=self.max_norm).to(X.dtype)
+
+
+class MaxNormManager:
+    """Apply the max-norm constraints of several weights at once.
+
+    The rows (slices along the first dimension) of all the constrained
+    weights are rescaled to at most their ``max_norm`` L2-norm. The row norms
+    are computed with one reduction per weight, and the scales and the
+    rescaling of all the weights with multi-tensor ``torch._foreach_*``
+    operations. Meant to be called after each optimizer step, so
+    the stored weights satisfy the constraints, like
+    :func:`braindecode.functional.max_norm_` for a single weight.
+
+    Parameters
+    ----------
+    params_and_max_norms : iterable of (torch.Tensor, float), optional
+        Weights to constrain, with their maximum row norm.
+
+    Examples
+    --------
+    >>> from braindecode.models import EEGNetv4
+    >>> model = EEGNetv4(n_chans=22, n_outputs=4, n_times=1000)
+    >>> max_norm_manager = MaxNormManager.from_module(model)
+    >>> # In the training loop, after optimizer.step():
+    >>> max_norm_manager.step()
+    """
+
+    def __init__(self, params_and_max_norms=None):
+        self.params = []
+        self.max_norms = []
+        self._norm_dims = []
+        self._inv_max_norms = []
+        for param, max_norm in params_and_max_norms or []:
+            self.add(param, max_norm)
+
+    @classmethod
+    def from_module(cls, module: nn.Module) -> "MaxNormManager":
+        """Collect the weights constrained with :class:`MaxNormParametrize`.
+
+        For parametrized layers such as
+        :class:`braindecode.modules.Conv2dWithConstraint` and
+        :class:`braindecode.modules.LinearWithConstraint`, the original,
+        unconstrained weight is collected.
+        """
+        manager = cls()
+        for submodule in module.modules():
+            # The parametrizations of each parametrized tensor
+            if not isinstance(submodule, parametrize.ParametrizationList):
+                continue
+            original = cast(torch.Tensor, submodule.original)
+            for parametrization in submodule:
+                if isinstance(parametrization, MaxNormParametrize):
+                    manager.add(original, parametrization.max_norm)
+        return manager
+
+    def add(self, param: torch.Tensor, max_norm: float):
+        """Add a weight to constrain to at most ``max_norm`` row norm."""
+        if param.dim() < 2:
+            raise ValueError(
+                f"MaxNormManager expects weights with at least 2 dimensions, "
+                f"got {param.dim()}."
+            )
+        self.params.append(param)
+        self.max_norms.append(float(max_norm))
+        self._inv_max_norms.append(1.0 / float(max_norm))
+        # The norms are reduced over all but the first dimension rather than
+        # over a flattened view, so weights in channels last, or whose data is
+        # rebound e.g. by a dtype cast, are still updated in place.
+        self._norm_dims.append(tuple(range(1, param.dim())))
+
+    @torch.no_grad()
+    def step(self):
+        """Rescale in-place the rows of all the weights above their max norm."""
+        if not self.params:
+            return
+        # (rows, 1, ..., 1) norms, broadcastable to their weight
+        norms = [
+            torch.linalg.vector_norm(param, dim=dims, keepdim=True)
+            for param, dims in zip(self.params, self._norm_dims)
+        ]
+        # Divide by max(norm / max_norm, 1)
+        torch._foreach_mul_(norms, self._inv_max_norms)
+        torch._foreach_clamp_min_(norms, 1.0)
+        torch._foreach_div_(self.params, norms)
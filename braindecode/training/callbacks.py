@@ -2,9 +2,10 @@
 #
 # License: BSD (3-clause)
 
-import torch
 from skorch.callbacks import Callback
 
+from braindecode.functional import max_norm_
+
 
 class MaxNormConstraintCallback(Callback):
     def on_batch_end(self, net, training, *args, **kwargs):
@@ -15,9 +16,7 @@ class MaxNormConstraintCallback(Callback):
                 if hasattr(module, "weight") and (
                     not module.__class__.__name__.startswith("BatchNorm")
                 ):
-                    module.weight.data = torch.renorm(
-                        module.weight.data, 2, 0, maxnorm=2
-                    )
+                    max_norm_(module.weight.data, max_norm=2)
                     last_weight = module.weight
             if last_weight is not None:
-                last_weight.data = torch.renorm(last_weight.data, 2, 0, maxnorm=0.5)
+                max_norm_(last_weight.data, max_norm=0.5)
@@ -2,8 +2,14 @@ import numpy as np
 import pytest
 import torch
 from scipy.signal import hilbert
+from torch import nn
 
-from braindecode.functional import hilbert_freq, plv_time
+from braindecode.functional import (
+    glorot_weight_zero_bias,
+    hilbert_freq,
+    max_norm_,
+    plv_time,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -66,3 +72,45 @@ def test_plv_time_perfect_synchronization():
     expected = torch.ones(batch, channels, channels)
     assert torch.allclose(plv_matrix, expected, atol=1e-5), \
         "PLV should be 1 for perfectly synchronized signals"
+
+
+def test_glorot_weight_zero_bias():
+    """
+    Test that batch norm weights are set to one and all biases to zero,
+    including batch norm layers without affine parameters.
+    """
+    model = nn.Sequential(
+        nn.Conv1d(3, 4, 3),
+        nn.BatchNorm1d(4),
+        nn.BatchNorm1d(4, affine=False),
+        nn.Conv1d(4, 4, 1, bias=False),
+        nn.Linear(4, 2),
+    )
+    for param in model.parameters():
+        nn.init.normal_(param)
+    conv_weight = model[0].weight.detach().clone()
+    glorot_weight_zero_bias(model)
+    assert torch.equal(model[0].weight, conv_weight)
+    assert torch.equal(model[1].weight, torch.ones(4))
+    for module in (model[0], model[1], model[4]):
+        assert torch.equal(module.bias, torch.zeros_like(module.bias))
+
+
+@pytest.mark.parametrize("shape", [(8, 4, 1, 5), (3, 16)])
+def test_max_norm_(shape):
+    """
+    Test that max_norm_ rescales in-place like torch.renorm.
+    """
+    weight = torch.randn(*shape)
+    expected = torch.renorm(weight, p=2, dim=0, maxnorm=1.0)
+    out = max_norm_(weight, max_norm=1.0)
+    assert out is weight
+    torch.testing.assert_close(weight, expected)
+
+
+def test_max_norm_rejects_1d_weight():
+    """
+    Test that max_norm_ raises on 1D weights, like torch.renorm.
+    """
+    with pytest.raises(ValueError, match="at least 2 dimensions"):
+        max_norm_(torch.ones(16), max_norm=2.0)
@@ -7,14 +7,18 @@
 #
 # License: BSD-3
 
+import copy
+import sys
 from collections import OrderedDict
 from functools import partial
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
 import torch
 from sklearn.utils import check_random_state
 from torch import nn
+from torch.nn.utils import parametrize
 
 from braindecode.models import (
     BIOT,
@@ -47,6 +51,7 @@ from braindecode.models import (
     TIDNet,
     USleep,
 )
+from braindecode.training.callbacks import MaxNormConstraintCallback
 from braindecode.util import set_random_seeds
 
 
@@ -1294,6 +1299,412 @@ def test_eegnetv4_final_layer_linear_false():
     assert "linearconstraint" not in submodule_names, "Did not expected a linearconstraint sub-module."
 
 
+def test_eegnetv4_fuse_separable_matches_sequential():
+    """Test that the fused separable conv is equivalent to the sequential one."""
+    kwargs = dict(n_chans=4, n_times=128, n_outputs=2,
+                  final_layer_with_constraint=True)
+    model_fused = EEGNetv4(fuse_separable=True, **kwargs).eval()
+    model_sequential = EEGNetv4(fuse_separable=False, **kwargs).eval()
+    model_sequential.load_state_dict(model_fused.state_dict())
+
+    X = torch.randn(2, 4, 128)
+    torch.testing.assert_close(model_fused(X), model_sequential(X))
+
+
+def test_eegnetv4_dimshuffle_is_a_view():
+    """Test that moving the singleton input dimension does not copy data."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2)
+    X = torch.randn(2, 4, 128, 1)
+    X_shuffled = model.dimshuffle(X)
+
+    assert X_shuffled.shape == (2, 1, 4, 128)
+    assert X_shuffled.data_ptr() == X.data_ptr()
+    assert X_shuffled.is_contiguous()
+
+
+@pytest.mark.parametrize("n_times_out, expected_shape", [(1, (2, 3)), (5, (2, 3, 5))])
+def test_eegnetv4_final_layer_squeeze_is_a_view(n_times_out, expected_shape):
+    """Test that the classifier output is squeezed without copying data."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=3)
+    y = torch.randn(2, 3, 1, n_times_out)
+    y_squeezed = model.final_layer.squeeze(y)
+
+    assert y_squeezed.shape == expected_shape
+    assert y_squeezed.data_ptr() == y.data_ptr()
+
+
+@pytest.mark.parametrize("n_times, expected_shape", [(32, (2, 3)), (128, (2, 3, 4))])
+def test_eegnetv4_final_conv_length_one_is_linear(n_times, expected_shape):
+    """Test the linear classifier, loaded from a convolutional checkpoint."""
+    with pytest.warns(DeprecationWarning):
+        model = EEGNetv4(n_chans=4, n_times=n_times, n_outputs=3,
+                         final_conv_length=1).eval()
+    assert isinstance(model.final_layer.linear, nn.Linear)
+
+    state_dict = {k: v.clone() for k, v in model.state_dict().items()}
+    conv_classifier = nn.Conv2d(16, 3, (1, 1))
+    state_dict.pop("final_layer.linear.weight")
+    state_dict.pop("final_layer.linear.bias")
+    state_dict["final_layer.conv_classifier.weight"] = conv_classifier.weight
+    state_dict["final_layer.conv_classifier.bias"] = conv_classifier.bias
+    model.load_state_dict(state_dict)
+
+    X = torch.randn(2, 4, n_times)
+    with torch.no_grad():
+        features = nn.Sequential(*list(model)[:-1])(X)
+        y_expected = conv_classifier(features.unsqueeze(2)).squeeze(2)
+        y = model(X)
+    assert y.shape == expected_shape
+    torch.testing.assert_close(y, y_expected.reshape(expected_shape))
+
+
+@pytest.mark.parametrize(
+    "kernel_length, n_times_total, hop", [(1, 448, 64), (64, 128, 16)]
+)
+def test_eegnetv4_forward_windows(kernel_length, n_times_total, hop):
+    """Test that sharing the temporal convolution matches windowed forwards.
+
+    Without temporal padding, or with a single window, no predictions are
+    affected by the window borders.
+    """
+    torch.manual_seed(0)
+    model = EEGNetv4(
+        n_chans=4, n_times=128, n_outputs=3, kernel_length=kernel_length
+    ).eval()
+    X = torch.randn(2, 4, n_times_total)
+    with torch.no_grad():
+        y = model.forward_windows(X, window_size=128, hop=hop)
+        windows = X.unfold(-1, 128, hop).permute(0, 2, 1, 3)
+        y_expected = model(windows.reshape(-1, 4, 128)).reshape(2, -1, 3)
+
+    assert y.shape == (2, (n_times_total - 128) // hop + 1, 3)
+    torch.testing.assert_close(y, y_expected)
+
+
+@pytest.mark.parametrize("final_layer_with_constraint", [False, True])
+def test_eegnetv4_fuse_for_inference(final_layer_with_constraint):
+    """Test that folding the batch norms preserves the eval outputs."""
+    torch.manual_seed(0)
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2,
+                     final_layer_with_constraint=final_layer_with_constraint)
+    # Update the running statistics of the batch norm layers
+    for _ in range(3):
+        model(torch.randn(8, 4, 128) * 3 + 1)
+    model.eval()
+    with pytest.raises(ValueError, match="call model.eval"):
+        model.train().fuse_for_inference()
+    model.eval()
+
+    X = torch.randn(2, 4, 128)
+    y_expected = model(X)
+    model.fuse_for_inference()
+
+    for name in ["bnorm_temporal", "bnorm_1", "bnorm_2"]:
+        assert isinstance(getattr(model, name), nn.Identity)
+    torch.testing.assert_close(model(X), y_expected, atol=1e-5, rtol=1e-4)
+
+
+def test_eegnetv4_fuse_for_inference_on_copy():
+    """Test that fusing a deep copy leaves the original model untouched."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2).eval()
+    X = torch.randn(2, 4, 128)
+    y_expected = model(X)
+
+    fused = copy.deepcopy(model).fuse_for_inference()
+
+    assert parametrize.is_parametrized(model.conv_spatial, "weight")
+    torch.testing.assert_close(model(X), y_expected)
+    torch.testing.assert_close(fused(X), y_expected, atol=1e-5, rtol=1e-4)
+
+
+def test_eegnetv4_batch_norm_layers_are_plain():
+    """Test that batch norm utilities see torch batch norm layers."""
+    torch.manual_seed(0)
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2).eval()
+
+    # The max-norm callback skips the batch norm weights
+    MaxNormConstraintCallback().on_batch_end(
+        SimpleNamespace(module_=model), training=True
+    )
+    assert torch.equal(model.bnorm_1.weight, torch.ones_like(model.bnorm_1.weight))
+
+    # The activations are kept when converting to SyncBatchNorm
+    X = torch.randn(2, 4, 128)
+    y_expected = model(X)
+    model_sync = nn.SyncBatchNorm.convert_sync_batchnorm(model)
+    assert isinstance(model_sync.bnorm_1, nn.SyncBatchNorm)
+    torch.testing.assert_close(model_sync(X), y_expected)
+
+
+def test_eegnetv4_channels_last():
+    """Test that the channels last memory format does not alter the outputs."""
+    kwargs = dict(n_chans=4, n_times=128, n_outputs=2)
+    model = EEGNetv4(**kwargs).eval()
+    model_channels_last = EEGNetv4(channels_last=True, **kwargs).eval()
+    model_channels_last.load_state_dict(model.state_dict())
+
+    assert model_channels_last.conv_temporal.weight.is_contiguous(
+        memory_format=torch.channels_last
+    )
+    X = torch.randn(2, 4, 128)
+    torch.testing.assert_close(model_channels_last(X), model(X))
+
+
+def test_eegnetv4_strip_dropout_for_inference():
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2).eval()
+    X = torch.randn(2, 4, 128)
+    y_expected = model(X)
+
+    assert model.strip_dropout_for_inference() is model
+    assert not any(isinstance(m, nn.Dropout) for m in model.modules())
+    torch.testing.assert_close(model(X), y_expected)
+
+
+@pytest.mark.parametrize("final_layer_with_constraint", [False, True])
+def test_eegnetv4_to_mixed_precision(final_layer_with_constraint):
+    """Test the bf16 model with batch norm kept in fp32."""
+    torch.manual_seed(0)
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2,
+                     final_layer_with_constraint=final_layer_with_constraint)
+    model.eval()
+    X = torch.randn(2, 4, 128)
+    y_fp32 = model(X)
+
+    model.to_mixed_precision(torch.bfloat16)
+
+    assert model.conv_temporal.weight.dtype == torch.bfloat16
+    assert model.bnorm_1.weight.dtype == torch.float32
+    assert model.bnorm_1.running_var.dtype == torch.float32
+    y_bf16 = model(X.to(torch.bfloat16))
+    assert y_bf16.dtype == torch.bfloat16
+    torch.testing.assert_close(y_bf16.float(), y_fp32, atol=5e-2, rtol=5e-2)
+
+
+@pytest.mark.parametrize("kernel_length", [64, 25])
+def test_eegnetv4_fft_temporal_conv(kernel_length):
+    """Test that the FFT temporal convolution matches the direct one."""
+    torch.manual_seed(0)
+    kwargs = dict(n_chans=4, n_times=600, n_outputs=2,
+                  kernel_length=kernel_length, drop_prob=0.0,
+                  final_layer_with_constraint=True)
+    model_fft = EEGNetv4(temporal_conv_impl="fft", **kwargs)
+    model_direct = EEGNetv4(temporal_conv_impl="direct", **kwargs)
+    model_direct.load_state_dict(model_fft.state_dict())
+    assert type(model_direct.conv_temporal) is nn.Conv2d
+    assert type(model_fft.conv_temporal) is not nn.Conv2d
+    # The FFT is opt-in
+    assert type(EEGNetv4(**kwargs).conv_temporal) is nn.Conv2d
+
+    X = torch.randn(2, 4, 600)
+    y_fft = model_fft(X)
+    y_direct = model_direct(X)
+    torch.testing.assert_close(y_fft, y_direct, atol=1e-4, rtol=1e-4)
+    grad_fft, = torch.autograd.grad(y_fft.sum(), model_fft.conv_temporal.weight)
+    grad_direct, = torch.autograd.grad(y_direct.sum(),
+                                       model_direct.conv_temporal.weight)
+    torch.testing.assert_close(grad_fft, grad_direct, atol=1e-4, rtol=1e-4)
+
+    model_fft.eval().fuse_for_inference()
+    model_direct.eval().fuse_for_inference()
+    torch.testing.assert_close(model_fft.to_torchscript()(X), model_direct(X),
+                               atol=1e-4, rtol=1e-4)
+
+    # fp64 models are not computed in fp32
+    model_fft.double()
+    model_direct.double()
+    torch.testing.assert_close(model_fft(X.double()), model_direct(X.double()),
+                               atol=1e-10, rtol=1e-10)
+
+
+def test_eegnetv4_enable_cuda_graph_requires_eval_and_cuda():
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2)
+    with pytest.raises(ValueError, match="call model.eval"):
+        model.enable_cuda_graph(batch_size=2)
+    if not torch.cuda.is_available():
+        with pytest.raises(ValueError, match="CUDA device"):
+            model.eval().enable_cuda_graph(batch_size=2)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires CUDA.")
+def test_eegnetv4_enable_cuda_graph():
+    """Test that replaying the captured graph matches the eager forward."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2).cuda().eval()
+    X = torch.randn(2, 4, 128, device="cuda")
+    with torch.no_grad():
+        y_expected = model(X)
+    model.enable_cuda_graph(batch_size=2)
+
+    torch.testing.assert_close(model(X).clone(), y_expected)
+    # Other batch sizes fall back to the eager forward
+    assert model(X[:1]).shape == (1, 2)
+
+
+@pytest.mark.parametrize("pool_mode, n_preds", [("mean", 123), ("max", 102)])
+def test_eegnetv4_to_dense_prediction_model(pool_mode, n_preds):
+    """Test that the dense prediction model works with the 1D layers."""
+    model = EEGNetv4(n_chans=4, n_outputs=3, n_times=256, pool_mode=pool_mode)
+    model.to_dense_prediction_model()
+    assert model.separable.depthwise.dilation == (4,)
+    assert model.pool_2.stride == (1,)
+    assert model.eval()(torch.randn(2, 4, 400)).shape == (2, 3, n_preds)
+
+
+def test_eegnetv4_cuda_graph_is_reset():
+    """Test that a stale graph is discarded and not replayed."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2).eval()
+    X = torch.randn(2, 4, 128)
+
+    def set_graph(dtype=torch.float32):
+        # Replaying fails, so the eager forward must be used
+        model._cuda_graph = SimpleNamespace()
+        model._static_input = torch.zeros(2, 4, 128, dtype=dtype)
+        model._static_output = torch.zeros(2, 2, dtype=dtype)
+
+    set_graph()
+    # Gradients enabled
+    assert model(X).requires_grad
+    with torch.no_grad():
+        # Other dtype
+        set_graph(torch.float64)
+        assert model(X).dtype == torch.float32
+        model.double()
+        assert model._cuda_graph is None
+        set_graph()
+        model.fuse_for_inference()
+        assert model._cuda_graph is None
+        set_graph()
+        model.to_mixed_precision(torch.bfloat16)
+        assert model._cuda_graph is None
+
+
+def test_eegnetv4_share_bn_stats_with():
+    """Test that the batch norm statistics are shared with the other model."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2)
+    model_shared = EEGNetv4(n_chans=4, n_times=128, n_outputs=2,
+                            share_bn_stats_with=model)
+    model_shared.to_mixed_precision(torch.bfloat16)
+    model(torch.randn(8, 4, 128) * 3 + 1)
+
+    assert model_shared.bnorm_1.running_mean is model.bnorm_1.running_mean
+    assert model_shared.bnorm_2.num_batches_tracked.item() == 1
+    assert model_shared.bnorm_1.weight is not model.bnorm_1.weight
+    with pytest.raises(ValueError, match="same batch norm"):
+        EEGNetv4(n_chans=4, n_times=128, n_outputs=2, F1=4,
+                 share_bn_stats_with=model)
+
+
+@pytest.mark.parametrize("model_class, kwargs", [
+    (EEGNetv4, {}),
+    (EEGNetv4, dict(channels_last=True, final_layer_with_constraint=True)),
+    (EEGNetv4, dict(activation=nn.GELU)),
+    (EEGNetv1, {}),
+])
+def test_eegnet_forward_matches_sequential(model_class, kwargs):
+    """Test that the explicit forward is the same as iterating the layers."""
+    model = model_class(n_chans=4, n_times=128, n_outputs=2, **kwargs).eval()
+    X = torch.randn(2, 4, 128)
+    torch.testing.assert_close(model(X), nn.Sequential.forward(model, X))
+
+
+@pytest.mark.skipif(
+    sys.platform.startswith("win"),
+    reason="torch.compile is known to have issues on Windows.",
+)
+@pytest.mark.parametrize("model_class", [EEGNetv4, EEGNetv1])
+def test_eegnet_compile(model_class):
+    """Test that the model compiled at construction matches the eager one."""
+    kwargs = dict(n_chans=4, n_times=128, n_outputs=2)
+    model = model_class(**kwargs).eval()
+    model_compiled = model_class(compile=True, **kwargs).eval()
+    model_compiled.load_state_dict(model.state_dict())
+
+    X = torch.randn(1, 4, 128)
+    torch.testing.assert_close(model_compiled(X), model(X), atol=1e-4, rtol=1e-4)
+    torch.compiler.reset()
+
+
+@pytest.mark.skipif(
+    sys.platform.startswith("win"),
+    reason="torch.script is known to have issues on Windows.",
+)
+@pytest.mark.parametrize("final_layer_with_constraint", [False, True])
+def test_eegnetv4_to_torchscript(final_layer_with_constraint, tmp_path):
+    """Test that the scripted model runs and matches the eager one."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2,
+                     final_layer_with_constraint=final_layer_with_constraint)
+    model.eval()
+    scripted_model = model.to_torchscript()
+    fname = tmp_path / "eegnetv4_scripted.pt"
+    scripted_model.save(str(fname))
+    loaded_model = torch.jit.load(str(fname))
+
+    X = torch.randn(2, 4, 128)
+    torch.testing.assert_close(loaded_model(X), model(X))
+    # The original model keeps its max-norm constraint
+    assert parametrize.is_parametrized(model.conv_spatial, "weight")
+
+
+@pytest.mark.parametrize("n_times", [64, 127, 128, 500, 1001])
+@pytest.mark.parametrize("kernel_length,depthwise_kernel_length", [(64, 16), (63, 15)])
+def test_eegnetv4_final_conv_length_auto(n_times, kernel_length,
+                                         depthwise_kernel_length):
+    """Test that the analytic output length matches the one of the layers."""
+    model = EEGNetv4(n_chans=3, n_times=n_times, n_outputs=2,
+                     kernel_length=kernel_length,
+                     depthwise_kernel_length=depthwise_kernel_length)
+    features = nn.Sequential(*list(model.children())[:-1])
+    with torch.no_grad():
+        n_out_time = features(torch.zeros(1, 3, n_times)).shape[-1]
+
+    assert model.final_conv_length == n_out_time
+
+
+def test_eegnetv4_too_short_input():
+    with pytest.raises(ValueError, match="requires longer chunks of signal"):
+        EEGNetv4(n_chans=3, n_times=16, n_outputs=2)
+
+
+def test_eegnetv1_too_short_input():
+    with pytest.raises(ValueError, match="require longer chunks of signal"):
+        EEGNetv1(n_chans=4, n_times=8, n_outputs=3)
+
+
+def test_eegnetv4_load_legacy_separable_state_dict():
+    """Test that checkpoints with the 2D separable conv weights still load."""
+    model = EEGNetv4(n_chans=4, n_times=128, n_outputs=2,
+                     final_layer_with_constraint=True)
+    state_dict = {k: v.clone() for k, v in model.state_dict().items()}
+    legacy_state_dict = {
+        k: v for k, v in state_dict.items() if not k.startswith("separable.")
+    }
+    legacy_state_dict["conv_separable_depth.weight"] = (
+        state_dict["separable.depthwise.weight"].unsqueeze(2) + 1
+    )
+    legacy_state_dict["conv_separable_point.weight"] = (
+        state_dict["separable.pointwise.weight"].unsqueeze(2) + 1
+    )
+
+    model.load_state_dict(legacy_state_dict)
+
+    torch.testing.assert_close(
+        model.separable.depthwise.weight,
+        state_dict["separable.depthwise.weight"] + 1,
+    )
+    torch.testing.assert_close(
+        model.separable.pointwise.weight,
+        state_dict["separable.pointwise.weight"] + 1,
+    )
+
+    # Only the legacy keys are reshaped, if squeezing gives the right shape
+    legacy_state_dict["conv_separable_point.weight"] = torch.rand(16, 16, 2, 1)
+    with pytest.raises(ValueError, match="Cannot load a tensor"):
+        model.load_state_dict(legacy_state_dict)
+    linear_key = "final_layer.linearconstraint.parametrizations.weight.original"
+    state_dict[linear_key] = state_dict[linear_key].T
+    with pytest.raises(RuntimeError, match="size mismatch"):
+        model.load_state_dict(state_dict)
+
+
 
 @pytest.mark.parametrize(
     "temporal_layer", ['VarLayer', 'StdLayer', 'LogVarLayer',
@@ -19,6 +19,7 @@ from braindecode.functional import drop_path
 from braindecode.modules import (
     MLP,
     CombinedConv,
+    Conv2dWithConstraint,
     DropPath,
     FilterBankLayer,
     LinearWithConstraint,
@@ -27,7 +28,11 @@ from braindecode.modules import (
     GeneralizedGaussianFilter,
     CausalConv1d,
     MaxNormLinear,
+    MaxNormManager,
+    MaxNormParametrize,
+    SeparableConv1d,
 )
+from braindecode.models.eegnet import _MeanPool1d
 from braindecode.models.labram import _SegmentPatch
 from braindecode.models.tidnet import _BatchNormZG, _DenseSpatialFilter
 from braindecode.models.ifnet import _SpatioTemporalFeatureBlock
@@ -219,6 +224,63 @@ def test_combined_conv(bias_time, bias_spat):
     assert (diff.abs().median() / sequential_out.abs().median()) < 1e-5
 
 
+@pytest.mark.parametrize("dtype", [torch.float64, torch.bfloat16])
+def test_max_norm_parametrize_precision(dtype):
+    weight = torch.randn(8, 4, 1, 5, dtype=torch.float64) * 3
+    expected = torch.renorm(weight, p=2, dim=0, maxnorm=1.0).to(dtype)
+    constrained = MaxNormParametrize(max_norm=1.0)(weight.to(dtype))
+
+    assert constrained.dtype == dtype
+    if dtype == torch.float64:
+        torch.testing.assert_close(constrained, expected, atol=1e-12, rtol=1e-12)
+    else:
+        torch.testing.assert_close(constrained, expected)
+
+
+def test_max_norm_manager_matches_renorm():
+    model = nn.Sequential(
+        Conv2dWithConstraint(8, 16, (4, 1), max_norm=1.0, groups=8),
+        nn.Flatten(),
+        LinearWithConstraint(16, 3, max_norm=0.25),
+    )
+    model[0].to(memory_format=torch.channels_last)
+    manager = MaxNormManager.from_module(model)
+    assert manager.max_norms == [1.0, 0.25]
+
+    for param in manager.params:
+        param.data.mul_(10)
+    expected = [torch.renorm(param, p=2, dim=0, maxnorm=max_norm)
+                for param, max_norm in zip(manager.params, manager.max_norms)]
+    manager.step()
+    for param, param_expected in zip(manager.params, expected):
+        torch.testing.assert_close(param, param_expected)
+
+
+@pytest.mark.parametrize("bias", [False, True])
+def test_separable_conv1d(bias):
+    x = torch.randn(8, 16, 100)
+    conv = SeparableConv1d(16, 12, 16, padding=8, bias=bias)
+
+    fused_out = conv(x)
+    sequential_out = conv.pointwise(conv.depthwise(x))
+
+    assert fused_out.shape == (8, 12, 101)
+    torch.testing.assert_close(fused_out, sequential_out, atol=1e-5, rtol=1e-4)
+
+
+@pytest.mark.parametrize("n_times", [32, 35])
+@pytest.mark.parametrize("kernel_size", [4, 8])
+def test_mean_pool1d_matches_avg_pool1d(n_times, kernel_size):
+    x = torch.randn(2, 16, n_times, requires_grad=True)
+    pooled = _MeanPool1d(kernel_size)(x)
+    expected = nn.AvgPool1d(kernel_size)(x)
+
+    torch.testing.assert_close(pooled, expected)
+    grad, = torch.autograd.grad(pooled.sum(), x)
+    grad_expected, = torch.autograd.grad(expected.sum(), x)
+    torch.testing.assert_close(grad, grad_expected)
+
+
 @pytest.mark.parametrize("hidden_features", [None, (10, 10), (50, 50, 50), [10, 10, 10]])
 def test_mlp_increase(hidden_features):
     model = MLP(in_features=40, hidden_features=hidden_features)